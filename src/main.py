@@ -1,10 +1,14 @@
-import base64
+import asyncio
+import binascii
 import logging
 import sqlite3
 import os
-import numpy as np
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pybase64
 import re
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List
 
@@ -14,18 +18,45 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # FastAPI app initialization
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # SQLite Database Configuration
 DATABASE = os.getenv("DATABASE", "audio_metadata.db")
 
+# Shared connection for the whole app; writes are serialized by _DB_LOCK
+_DB = sqlite3.connect(DATABASE, check_same_thread=False, cached_statements=256)
+_DB.execute("PRAGMA journal_mode=WAL")
+_DB.execute("PRAGMA synchronous=NORMAL")
+_DB.execute("PRAGMA temp_store=MEMORY")
+_DB_LOCK = threading.Lock()
+
+# Kept as a single constant so sqlite3's statement cache reuses the prepared INSERT
+_INSERT_SQL = """
+    INSERT INTO audio_metadata (session_id, timestamp, file_name, length_seconds)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Payload limits, checked before any base64 data is scanned
+MAX_FILES = 64
+MAX_B64_BYTES = 50 * 1024 * 1024
+
+# Base64 is validated in slices of this many characters (a multiple of 4), so
+# only a bounded decode buffer is allocated however large the file is
+_VALIDATION_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Files are validated in parallel; pybase64 releases the GIL while decoding
+_VALIDATION_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# ISO 8601 UTC timestamp, e.g. 2025-01-02T12:00:00Z
+_TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z$")
+
 
 def init_db():
     """
     Initializes the SQLite database and creates the audio_metadata table if it doesn't exist.
     """
-    with sqlite3.connect(DATABASE) as conn:
-        conn.execute("""
+    with _DB_LOCK, _DB:
+        _DB.execute("""
             CREATE TABLE IF NOT EXISTS audio_metadata (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 session_id TEXT NOT NULL,
@@ -34,7 +65,6 @@ def init_db():
                 length_seconds REAL NOT NULL
             )
         """)
-        conn.commit()
     logger.info("Database initialized successfully.")
 
 
@@ -44,6 +74,8 @@ init_db()
 # Pydantic models
 class AudioFile(BaseModel):
     file_name: str
+    # Kept as str: pydantic 1.x would copy it via str.encode() for a bytes
+    # field, while pybase64 reads ASCII str data in place.
     encoded_audio: str
 
 
@@ -53,66 +85,108 @@ class AudioPayload(BaseModel):
     audio_files: List[AudioFile]
 
 
-def calculate_audio_length(audio_array: np.ndarray, sample_rate: int) -> float:
+def decoded_length(encoded_audio: str) -> int:
     """
-    Calculates the duration of an audio file in seconds.
+    Calculates the size of base64-encoded data after decoding, without decoding it.
+
+    Only the last two characters are inspected, since padding is at most "==".
 
     Args:
-        audio_array (np.ndarray): The audio data as a NumPy array.
+        encoded_audio (str): The padded base64-encoded data.
+
+    Returns:
+        int: The number of decoded bytes.
+    """
+    n = len(encoded_audio)
+    if n < 2:
+        return 0
+    padding = (encoded_audio[-1] == "=") + (encoded_audio[-2] == "=")
+    return (n >> 2) * 3 - padding
+
+
+def calculate_audio_length(num_bytes: int, sample_rate: int) -> float:
+    """
+    Calculates the duration of an audio file of 16-bit samples in seconds.
+
+    Args:
+        num_bytes (int): The size of the decoded audio data in bytes.
         sample_rate (int): The sample rate of the audio.
 
     Returns:
         float: The duration of the audio in seconds.
     """
-    return len(audio_array) / sample_rate
+    return (num_bytes >> 1) / sample_rate
 
 
-def store_audio_metadata(
-    session_id: str, timestamp: str, file_name: str, length_seconds: float
-):
+def store_audio_metadata(rows: list[tuple[str, str, str, float]]):
     """
-    Stores audio metadata in the SQLite database.
+    Stores audio metadata in the SQLite database in a single transaction.
 
     Args:
-        session_id (str): The session ID.
-        timestamp (str): The timestamp of the audio file.
-        file_name (str): The name of the audio file.
-        length_seconds (float): The length of the audio file in seconds.
+        rows (List[Tuple[str, str, str, float]]): One
+            (session_id, timestamp, file_name, length_seconds) tuple per file.
 
     Raises:
         HTTPException: If there is an error during database insertion.
     """
     try:
-        with sqlite3.connect(DATABASE) as conn:
-            conn.execute(
-                """
-                INSERT INTO audio_metadata (session_id, timestamp, file_name, length_seconds)
-                VALUES (?, ?, ?, ?)
-            """,
-                (session_id, timestamp, file_name, length_seconds),
-            )
-            conn.commit()
-        logger.info(f"Metadata stored successfully for file: {file_name}")
+        with _DB_LOCK, _DB:
+            _DB.executemany(_INSERT_SQL, rows)
+        logger.info("Metadata stored successfully for %d files", len(rows))
     except Exception as e:
-        logger.error(f"Error storing metadata for {file_name}: {e}")
+        logger.error(
+            "Error storing metadata for %s: %s", [row[2] for row in rows], e
+        )
         raise HTTPException(status_code=500, detail="Failed to store audio metadata")
 
 
 def validate_audio_files_present(audio_files: list[AudioFile]):
     """
-    Validates that the list of audio files is not empty.
+    Validates that the list of audio files is not empty and not too long.
 
     Args:
         audio_files (List[AudioFile]): List of audio files to validate.
 
     Raises:
-        ExceptionCustom: If the list of audio files is empty.
+        ExceptionCustom: If the list of audio files is empty or has more than
+            MAX_FILES entries.
 
     Returns:
-        bool: True if the list contains audio files.
+        bool: True if the list contains an acceptable number of audio files.
     """
     if not audio_files:
         raise HTTPException(status_code=400, detail="No audio files provided!")
+    if len(audio_files) > MAX_FILES:
+        raise HTTPException(status_code=400, detail="Too many audio files provided!")
+    return True
+
+
+def validate_sizes(audio_files: list[AudioFile]):
+    """
+    Validates the size of each audio file's base64 encoding without scanning it.
+
+    Args:
+        audio_files (List[AudioFile]): List of audio files to validate.
+
+    Raises:
+        ExceptionCustom: If an encoding is larger than MAX_B64_BYTES or its
+            length is not a multiple of 4.
+
+    Returns:
+        bool: True if all audio file sizes are acceptable.
+    """
+    for audio_file in audio_files:
+        size = len(audio_file.encoded_audio)
+        if size > MAX_B64_BYTES:
+            raise HTTPException(status_code=400, detail="Audio file too large!")
+        if size % 4:
+            logger.warning(
+                "Base64 validation error for file %s: length %d is not a multiple of 4",
+                audio_file.file_name,
+                size,
+            )
+            raise HTTPException(
+                status_code=400, detail="Invalid base64 encoding file!")
     return True
 
 
@@ -129,12 +203,31 @@ def validate_timestamp(timestamp: str):
     Returns:
         bool: True if the timestamp format is valid.
     """
-    timestamp_pattern = r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z$"
-    if not re.fullmatch(timestamp_pattern, timestamp):
+    if not _TIMESTAMP_RE.fullmatch(timestamp):
         raise HTTPException(status_code=400, detail="Invalid timestamp format!")
     return True
 
 
+def validate_base64(encoded_audio: str):
+    """
+    Validates padded base64 data without decoding it into one buffer.
+
+    Args:
+        encoded_audio (str): The base64-encoded data to validate.
+
+    Raises:
+        binascii.Error: If the data is not valid padded base64, including data
+            with non-ASCII characters.
+    """
+    size = len(encoded_audio)
+    for start in range(0, size, _VALIDATION_CHUNK_SIZE):
+        end = start + _VALIDATION_CHUNK_SIZE
+        chunk = encoded_audio[start:end]
+        pybase64.b64decode(chunk, validate=True)
+        if end < size and chunk.endswith("="):
+            raise binascii.Error("Padding found before the end of the data")
+
+
 def validate_audio_file(audio_files: list[AudioFile]):
     """
     Validates that each audio file's base64 encoding is valid.
@@ -148,17 +241,22 @@ def validate_audio_file(audio_files: list[AudioFile]):
     Returns:
         bool: True if all audio files are valid.
     """
-    for audio_file in audio_files:
+    futures = [
+        _VALIDATION_POOL.submit(validate_base64, audio_file.encoded_audio)
+        for audio_file in audio_files
+    ]
+    for audio_file, future in zip(audio_files, futures):
         try:
-            decoded = base64.b64decode(audio_file.encoded_audio, validate=True)
-            if base64.b64encode(decoded).decode() == audio_file.encoded_audio:
-                return True
-        except Exception as e:
+            future.result()
+        except (binascii.Error, ValueError) as e:
             logger.warning(
-                f"Base64 validation error for file {audio_file.file_name}: {e}"
+                "Base64 validation error for file %s: %s", audio_file.file_name, e
             )
+            for pending in futures:
+                pending.cancel()
             raise HTTPException(
                 status_code=400, detail="Invalid base64 encoding file!")
+    return True
 
 
 def validate_payload(payload: AudioPayload) -> bool:
@@ -173,6 +271,7 @@ def validate_payload(payload: AudioPayload) -> bool:
     """
     return (
         validate_audio_files_present(payload.audio_files)
+        and validate_sizes(payload.audio_files)
         and validate_timestamp(payload.timestamp)
         and validate_audio_file(payload.audio_files)
     )
@@ -191,37 +290,31 @@ async def process_audio(payload: AudioPayload):
     """
     sample_rate = 4000
     processed_files = []
+    rows = []
 
-    if not validate_payload(payload):
+    # Base64 validation and SQLite writes block, so keep them off the event loop
+    if not await asyncio.to_thread(validate_payload, payload):
         return {"status": "error", "message": "Invalid audio file metadata or payload."}
 
+    session_id = payload.session_id
+    timestamp = payload.timestamp
     for audio_file in payload.audio_files:
-        try:
-            audio_array = np.frombuffer(
-                base64.b64decode(audio_file.encoded_audio), dtype=np.int16
-            )
-            length_seconds = calculate_audio_length(audio_array, sample_rate)
-
-            store_audio_metadata(
-                payload.session_id,
-                payload.timestamp,
-                audio_file.file_name,
-                length_seconds,
-            )
-
-            processed_files.append(
-                {
-                    "file_name": audio_file.file_name,
-                    "length_seconds": round(length_seconds, 2),
-                }
-            )
-        except HTTPException as e:
-            logger.error(f"Failed to process file {audio_file.file_name}: {e.detail}")
-            continue
-        except Exception as e:
+        file_name = audio_file.file_name
+        num_bytes = decoded_length(audio_file.encoded_audio)
+        if num_bytes & 1:
             logger.error(
-                f"Unexpected error processing file {audio_file.file_name}: {e}"
+                "Skipping file %s: audio data size must be a multiple of 2 bytes",
+                file_name,
             )
             continue
 
+        length_seconds = calculate_audio_length(num_bytes, sample_rate)
+        rows.append((session_id, timestamp, file_name, length_seconds))
+        processed_files.append(
+            {"file_name": file_name, "length_seconds": round(length_seconds, 2)}
+        )
+
+    if rows:
+        await asyncio.to_thread(store_audio_metadata, rows)
+
     return {"status": "success", "processed_files": processed_files}
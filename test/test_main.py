@@ -1,10 +1,12 @@
 import base64
+import logging
 import os
 
 import numpy as np
 import pytest
 import sqlite3
 from fastapi.testclient import TestClient
+import main
 from main import app, init_db, AudioFile, AudioPayload
 
 
@@ -28,9 +30,22 @@ def encode_audio() -> bytes:
     )
 
 
-# Function to create a non base64 encoded audio file
+# Function to create a non base64 encoded audio file; its length is a multiple
+# of 4 so it gets past the size checks and reaches base64 validation
 def encode_invalid_audio() -> str:
-    return str(np.random.randint(-32768, 32767, 4000, dtype=np.int16))
+    return "QUF!" * 1000
+
+
+# Database connection stand-in whose inserts always fail
+class FailingConnection:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def executemany(self, *args):
+        raise sqlite3.OperationalError("database is locked")
 
 
 # Test Case 1: Process Audio and Store Metadata
@@ -150,3 +165,203 @@ def test_process_multiple_audio_files():
     conn.close()
 
     assert len(rows) == 2  # Two rows should be inserted for the two audio files
+
+
+# Test Case 6: Invalid Base64 Encoding After A Valid File
+def test_invalid_base64_after_valid_audio():
+    payload = AudioPayload(
+        session_id="test-session",
+        timestamp="2025-01-02T12:00:00Z",
+        audio_files=[
+            AudioFile(file_name="test_audio_1.wav", encoded_audio=encode_audio()),
+            AudioFile(
+                file_name="test_audio_2.wav", encoded_audio=encode_invalid_audio()
+            ),
+        ],
+    )
+
+    client = TestClient(app)
+    response = client.post("/process-audio", json=payload.dict())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid base64 encoding file!"
+
+
+# Test Case 7: Padding Inside The Data Across Validation Chunks
+def test_invalid_base64_padding_between_chunks(monkeypatch):
+    monkeypatch.setattr(main, "_VALIDATION_CHUNK_SIZE", 8)
+    payload = AudioPayload(
+        session_id="test-session",
+        timestamp="2025-01-02T12:00:00Z",
+        audio_files=[
+            AudioFile(file_name="test_audio.wav", encoded_audio="QUFBQQ==QUFBQUFB")
+        ],
+    )
+
+    client = TestClient(app)
+    response = client.post("/process-audio", json=payload.dict())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid base64 encoding file!"
+
+
+# Test Case 8: Too Many Audio Files
+def test_too_many_audio_files():
+    payload = AudioPayload(
+        session_id="test-session",
+        timestamp="2025-01-02T12:00:00Z",
+        audio_files=[
+            AudioFile(file_name=f"test_audio_{i}.wav", encoded_audio="AAAA")
+            for i in range(main.MAX_FILES + 1)
+        ],
+    )
+
+    client = TestClient(app)
+    response = client.post("/process-audio", json=payload.dict())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Too many audio files provided!"
+
+
+# Test Case 9: Audio File Too Large
+def test_audio_file_too_large(monkeypatch):
+    monkeypatch.setattr(main, "MAX_B64_BYTES", 8)
+    payload = AudioPayload(
+        session_id="test-session",
+        timestamp="2025-01-02T12:00:00Z",
+        audio_files=[
+            AudioFile(file_name="test_audio.wav", encoded_audio=encode_audio())
+        ],
+    )
+
+    client = TestClient(app)
+    response = client.post("/process-audio", json=payload.dict())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Audio file too large!"
+
+
+# Test Case 10: Database Failure While Storing Metadata
+def test_store_metadata_failure(monkeypatch):
+    monkeypatch.setattr(main, "_DB", FailingConnection())
+    payload = AudioPayload(
+        session_id="test-session",
+        timestamp="2025-01-02T12:00:00Z",
+        audio_files=[
+            AudioFile(file_name="test_audio.wav", encoded_audio=encode_audio())
+        ],
+    )
+
+    client = TestClient(app)
+    response = client.post("/process-audio", json=payload.dict())
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Failed to store audio metadata"
+
+
+# Test Case 11: Audio Length Is Derived From The Sample Count
+def test_audio_length_seconds():
+    payload = AudioPayload(
+        session_id="test-session",
+        timestamp="2025-01-02T12:00:00Z",
+        audio_files=[
+            AudioFile(file_name="test_audio.wav", encoded_audio=encode_audio())
+        ],
+    )
+
+    client = TestClient(app)
+    response = client.post("/process-audio", json=payload.dict())
+
+    assert response.status_code == 200
+    assert response.json()["processed_files"][0]["length_seconds"] == 1.0
+
+    conn = sqlite3.connect(os.getenv("DATABASE", "audio_metadata.db"))
+    cursor = conn.cursor()
+    cursor.execute("SELECT length_seconds FROM audio_metadata")
+    rows = cursor.fetchall()
+    conn.close()
+
+    assert rows == [(1.0,)]
+
+
+# Test Case 12: Decoded Size From Base64 Padding, Partial Samples Skipped
+def test_audio_length_from_base64_padding():
+    payload = AudioPayload(
+        session_id="test-session",
+        timestamp="2025-01-02T12:00:00Z",
+        audio_files=[
+            AudioFile(file_name="empty.wav", encoded_audio=""),
+            AudioFile(file_name="one_byte.wav", encoded_audio="QQ=="),
+            AudioFile(file_name="two_bytes.wav", encoded_audio="QUE="),
+            AudioFile(file_name="three_bytes.wav", encoded_audio="QUFB"),
+            AudioFile(file_name="four_bytes.wav", encoded_audio="QUFBQQ=="),
+        ],
+    )
+
+    client = TestClient(app)
+    response = client.post("/process-audio", json=payload.dict())
+
+    assert response.status_code == 200
+    processed_files = response.json()["processed_files"]
+    assert [f["file_name"] for f in processed_files] == [
+        "empty.wav",
+        "two_bytes.wav",
+        "four_bytes.wav",
+    ]
+
+    conn = sqlite3.connect(os.getenv("DATABASE", "audio_metadata.db"))
+    cursor = conn.cursor()
+    cursor.execute("SELECT file_name, length_seconds FROM audio_metadata ORDER BY id")
+    rows = cursor.fetchall()
+    conn.close()
+
+    assert rows == [
+        ("empty.wav", 0.0),
+        ("two_bytes.wav", 1 / 4000),
+        ("four_bytes.wav", 2 / 4000),
+    ]
+
+
+# Test Case 13: Base64 Length Not A Multiple Of 4
+def test_invalid_base64_length():
+    payload = AudioPayload(
+        session_id="test-session",
+        timestamp="2025-01-02T12:00:00Z",
+        audio_files=[AudioFile(file_name="test_audio.wav", encoded_audio="QUFBQ")],
+    )
+
+    client = TestClient(app)
+    response = client.post("/process-audio", json=payload.dict())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid base64 encoding file!"
+
+
+# Test Case 14: Parallel Validation Reports The Invalid File
+def test_parallel_validation_reports_invalid_file(caplog):
+    payload = AudioPayload(
+        session_id="test-session",
+        timestamp="2025-01-02T12:00:00Z",
+        audio_files=[
+            AudioFile(file_name="test_audio_1.wav", encoded_audio=encode_audio()),
+            AudioFile(
+                file_name="test_audio_2.wav", encoded_audio=encode_invalid_audio()
+            ),
+        ],
+    )
+
+    client = TestClient(app)
+    with caplog.at_level(logging.WARNING, logger="main"):
+        response = client.post("/process-audio", json=payload.dict())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid base64 encoding file!"
+
+    warnings = [
+        record.getMessage()
+        for record in caplog.records
+        if record.name == "main" and record.levelno == logging.WARNING
+    ]
+    assert len(warnings) == 1
+    assert "test_audio_2.wav" in warnings[0]
+    assert "test_audio_1.wav" not in warnings[0]